@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+FedAvg聚合拓扑基准测试：FederatedServer.aggregate在不同分组下的吞吐量（合成权重，形状同MNIST CNN）
+分组: flat（不分组）| grouped（trainer使用的chunk_groups）| worker（client_id % 工作进程数）|
+      tier（TieringSystem对合成延迟分层后，vanilla式随机cohort中各客户端的层级）
+使用方法: python benchmarks/aggregation_bench.py --cohorts 10 50 100 200 --groups 4 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.server import FederatedServer, chunk_groups
+from core.tiering import TieringSystem
+
+# models/networks.py中create_mnist_model的权重形状
+MNIST_SHAPES = [(3, 3, 1, 32), (32,), (3, 3, 32, 64), (64,), (9216, 128), (128,), (128, 10), (10,)]
+CPU_ALLOC = [2.0, 1.0, 0.75, 0.5, 0.25]
+
+class _NullModel:
+    """只接收聚合结果，不做计算"""
+    def compile(self, **kwargs):
+        pass
+    
+    def set_weights(self, weights):
+        pass
+
+def make_tiers(num_clients, num_tiers, rng):
+    """按main.py的方式给客户端分配CPU，用带噪声的延迟做真实分层"""
+    clients_per_group = num_clients // len(CPU_ALLOC)
+    latencies = {
+        cid: 1.0 / CPU_ALLOC[min(cid // clients_per_group, len(CPU_ALLOC) - 1)]
+        * rng.lognormal(0.0, 0.1)
+        for cid in range(num_clients)
+    }
+    tiers = TieringSystem(num_tiers=num_tiers).create_tiers(latencies)
+    return {cid: tid for tid, info in tiers.items() for cid in info['clients']}
+
+def timed(server, weights, sizes, groups, repeats):
+    server.aggregate(weights, sizes, groups)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = server.aggregate(weights, sizes, groups)
+    return (time.perf_counter() - start) / repeats, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cohorts', type=int, nargs='+', default=[10, 50, 100, 200])
+    parser.add_argument('--groups', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--tiers', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    population = 2 * max(args.cohorts)
+    client_tier = make_tiers(population, args.tiers, rng)
+    server = FederatedServer(_NullModel(), (None, None), max_workers=max(args.groups, args.workers))
+    
+    print(f"{'clients':>8}{'topology':>10}{'groups':>8}{'time(ms)':>10}{'clients/s':>11}{'max diff':>11}")
+    for cohort in args.cohorts:
+        client_ids = rng.choice(population, cohort, replace=False)
+        weights = [[rng.standard_normal(shape, dtype=np.float32) for shape in MNIST_SHAPES]
+                   for _ in range(cohort)]
+        sizes = rng.integers(100, 1200, cohort).tolist()
+        groupings = {
+            'flat': None,
+            'grouped': chunk_groups(cohort, args.groups),
+            'worker': [int(cid) % args.workers for cid in client_ids],
+            'tier': [client_tier[int(cid)] for cid in client_ids],
+        }
+        reference = None
+        for name, groups in groupings.items():
+            elapsed, result = timed(server, weights, sizes, groups, args.repeats)
+            if reference is None:
+                reference = result
+            diff = max(float(np.abs(a - b).max()) for a, b in zip(reference, result))
+            num_groups = 1 if groups is None else len(set(groups))
+            print(f"{cohort:>8}{name:>10}{num_groups:>8}{elapsed*1000:>10.1f}"
+                  f"{cohort/elapsed:>11.0f}{diff:>11.2e}")
+    server.close()
+
+if __name__ == '__main__':
+    main()
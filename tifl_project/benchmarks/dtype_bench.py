@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+精度策略基准测试：数据集内存、本地训练吞吐量、FedAvg聚合耗时
+使用方法: python benchmarks/dtype_bench.py --dataset mnist --samples 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import tensorflow as tf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.loader import load_dataset
+from models.networks import get_model
+from models.precision import DTYPE_POLICIES, set_dtype_policy, data_dtype, wrap_optimizer
+from core.server import FederatedServer
+
+def legacy_aggregate(client_weights_list, client_data_sizes):
+    """旧实现：堆叠所有客户端后按NumPy默认dtype求和"""
+    total_size = sum(client_data_sizes)
+    return [
+        np.sum(np.array([w[i] * client_data_sizes[j] for j, w in enumerate(client_weights_list)]),
+               axis=0) / total_size
+        for i in range(len(client_weights_list[0]))
+    ]
+
+def bench_memory(dataset):
+    (x_legacy, _), _ = load_dataset(dataset, dtype=np.float64)
+    print(f"{'data dtype':>12}{'train MB':>12}")
+    print(f"{'float64':>12}{x_legacy.nbytes / 2**20:>12.1f}")
+    del x_legacy
+    for dtype in sorted(set(DTYPE_POLICIES.values()), key=lambda d: np.dtype(d).itemsize, reverse=True):
+        (x, _), _ = load_dataset(dataset, dtype=dtype)
+        print(f"{np.dtype(dtype).name:>12}{x.nbytes / 2**20:>12.1f}")
+
+def bench_training(dataset, num_samples, batch_size, epochs):
+    print(f"\n{'policy':>16}{'samples/s':>12}")
+    for policy in DTYPE_POLICIES:
+        set_dtype_policy(policy)
+        (x, y), _ = load_dataset(dataset, data_dtype(policy))
+        x, y = x[:num_samples], y[:num_samples]
+        model = get_model(dataset)
+        model.compile(optimizer=wrap_optimizer(tf.keras.optimizers.RMSprop(learning_rate=0.01)),
+                      loss='sparse_categorical_crossentropy')
+        model.fit(x[:batch_size], y[:batch_size], batch_size=batch_size, verbose=0)  # 预热
+        start = time.perf_counter()
+        model.fit(x, y, epochs=epochs, batch_size=batch_size, verbose=0)
+        elapsed = time.perf_counter() - start
+        print(f"{policy:>16}{num_samples * epochs / elapsed:>12.0f}")
+    set_dtype_policy('float32')
+
+def bench_aggregation(dataset, num_clients, repeats):
+    model = get_model(dataset)
+    server = FederatedServer(model, (None, None))
+    base = model.get_weights()
+    client_weights = [[w + np.float32(0.01 * i) for w in base] for i in range(num_clients)]
+    sizes = list(np.random.randint(100, 1000, num_clients))
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        legacy_aggregate(client_weights, sizes)
+    legacy = (time.perf_counter() - start) / repeats
+    start = time.perf_counter()
+    for _ in range(repeats):
+        server.aggregate(client_weights, sizes)
+    current = (time.perf_counter() - start) / repeats
+    print(f"\naggregate {num_clients} clients: legacy {legacy*1000:.1f}ms (float64), "
+          f"current {current*1000:.1f}ms (float32)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dataset', type=str, default='mnist')
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--batch_size', type=int, default=10)
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    
+    bench_memory(args.dataset)
+    bench_training(args.dataset, args.samples, args.batch_size, args.epochs)
+    bench_aggregation(args.dataset, args.clients, args.repeats)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+AdaptiveScheduler层级采样基准测试
+使用方法: python benchmarks/scheduler_bench.py --tiers 100 200 500 --rounds 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.tiering import AdaptiveScheduler
+
+def legacy_select_tier(probs, credits, initial_credits):
+    """旧实现：每次重建列表并拒绝采样"""
+    while True:
+        tier_id = np.random.choice(list(probs.keys()), p=list(probs.values()))
+        if credits[tier_id] > 0:
+            credits[tier_id] -= 1
+            return tier_id
+        if all(c == 0 for c in credits.values()):
+            for k in credits:
+                credits[k] = initial_credits
+
+def make_tiers(num_tiers):
+    return {i: {'clients': [i], 'avg_latency': float(i)} for i in range(num_tiers)}
+
+def skewed_probs(num_tiers):
+    p = np.random.random_sample(num_tiers) + 0.05
+    return p / p.sum()
+
+def bench(num_tiers, num_rounds, credits):
+    np.random.seed(0)
+    p = skewed_probs(num_tiers)
+    
+    legacy_probs = {i: p[i] for i in range(num_tiers)}
+    legacy_credits = {i: credits for i in range(num_tiers)}
+    start = time.perf_counter()
+    for _ in range(num_rounds):
+        legacy_select_tier(legacy_probs, legacy_credits, credits)
+    legacy = time.perf_counter() - start
+    
+    scheduler = AdaptiveScheduler(make_tiers(num_tiers), interval=num_rounds + 1,
+                                  initial_credits=credits)
+    scheduler.probs[:] = p
+    start = time.perf_counter()
+    for r in range(num_rounds):
+        scheduler.select_tier(r)
+    per_round = time.perf_counter() - start
+    
+    scheduler = AdaptiveScheduler(make_tiers(num_tiers), interval=num_rounds + 1,
+                                  initial_credits=credits)
+    scheduler.probs[:] = p
+    start = time.perf_counter()
+    scheduler.select_tiers(0, num_rounds)
+    block = time.perf_counter() - start
+    
+    return legacy, per_round, block
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tiers', type=int, nargs='+', default=[100, 200, 500])
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--credits', type=int, default=10)
+    args = parser.parse_args()
+    
+    print(f"{'tiers':>8}{'legacy(s)':>14}{'select_tier(s)':>16}{'select_tiers(s)':>17}{'speedup':>10}")
+    for num_tiers in args.tiers:
+        legacy, per_round, block = bench(num_tiers, args.rounds, args.credits)
+        print(f"{num_tiers:>8}{legacy:>14.3f}{per_round:>16.3f}{block:>17.3f}{legacy/per_round:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,19 @@
 import tensorflow as tf
 import numpy as np
 import time
+from models.precision import wrap_optimizer
 
 class Client:
-    def __init__(self, client_id, data, model, cpu_capacity):
+    def __init__(self, client_id, data, model, cpu_capacity, cost_model=None, holdout=None):
         self.client_id = client_id
         self.x_train, self.y_train = data
+        # 本地验证集（不参与训练），用于分层评估
+        self.x_holdout, self.y_holdout = holdout if holdout is not None else (None, None)
         self.model = tf.keras.models.clone_model(model)
         self.cpu_capacity = cpu_capacity
         self.data_size = len(self.x_train)
+        # 给出时用解析式延迟模型代替实测时间（core.cost_model.CostModel）
+        self.cost_model = cost_model
     
     def train(self, global_weights, lr=0.01, decay=0.995, epochs=1, batch_size=10):
         """
@@ -19,7 +24,7 @@ class Client:
         self.model.set_weights(global_weights)
         
         # 编译模型
-        optimizer = tf.keras.optimizers.RMSprop(learning_rate=lr, decay=decay)
+        optimizer = wrap_optimizer(tf.keras.optimizers.RMSprop(learning_rate=lr, decay=decay))
         self.model.compile(
             optimizer=optimizer,
             loss='sparse_categorical_crossentropy',
@@ -37,7 +42,10 @@ class Client:
         actual_time = time.time() - start_time
         
         # 模拟延迟（根据CPU容量）
-        simulated_time = actual_time / self.cpu_capacity
+        if self.cost_model:
+            simulated_time = self.estimate_time(epochs, batch_size)
+        else:
+            simulated_time = actual_time / self.cpu_capacity
         
         # 获取更新后的权重
         updated_weights = self.model.get_weights()
@@ -45,12 +53,23 @@ class Client:
         
         return updated_weights, simulated_time, loss
     
-    def get_loss(self, global_weights):
-        """计算本地损失（用于选择策略）"""
+    def estimate_time(self, epochs=1, batch_size=10, stream='train'):
+        """用解析式延迟模型估计本地训练耗时，不做实际计算（分层分析用stream='profile'）"""
+        return self.cost_model.latency(
+            self.data_size, epochs=epochs, cpu_capacity=self.cpu_capacity,
+            batch_size=batch_size, client_id=self.client_id, stream=stream
+        )
+    
+    def get_loss(self, global_weights, max_samples=None):
+        """计算本地损失（用于选择策略）；max_samples给出时只在随机抽样上计算"""
         self.model.set_weights(global_weights)
         self.model.compile(
             optimizer='rmsprop',
             loss='sparse_categorical_crossentropy'
         )
-        loss = self.model.evaluate(self.x_train, self.y_train, verbose=0)
+        x, y = self.x_train, self.y_train
+        if max_samples and self.data_size > max_samples:
+            idx = np.random.choice(self.data_size, max_samples, replace=False)
+            x, y = x[idx], y[idx]
+        loss = self.model.evaluate(x, y, verbose=0)
         return loss
@@ -0,0 +1,82 @@
+import tensorflow as tf
+import numpy as np
+
+class CostModel:
+    """
+    解析式延迟模型：由Keras模型结构推导每个样本的FLOPs和访存字节数，
+    latency = (计算时间 + 访存时间) * epochs / cpu_capacity
+    不依赖宿主机实际运行时间，分层结果可复现；noise/drift可选
+    """
+    # 反向传播约为前向的2倍，训练一步约3倍前向
+    TRAIN_FLOPS_FACTOR = 3.0
+    
+    def __init__(self, model, flops_per_second=1e10, bytes_per_second=1e10,
+                 noise=0.0, drift=0.0, seed=None):
+        self.flops_per_second = flops_per_second
+        self.bytes_per_second = bytes_per_second
+        self.noise = noise  # 每次调用的对数正态噪声标准差
+        self.drift = drift  # 每个客户端速度的对数随机游走步长
+        # 每个(客户端, 用途)独立的随机数流，由(seed, client_id, stream)派生：
+        # 分析阶段（profile，在服务器上）与训练阶段（train，可能在worker上）互不消耗对方的随机数，
+        # 因此训练计时只取决于该客户端被训练的次数，与是否使用--workers无关
+        self.seed = seed if seed is not None else int(np.random.randint(0, 2**31 - 1))
+        self.client_rngs = {}
+        self.client_drift = {}
+        self.flops_per_sample, self.bytes_per_sample, self.param_bytes = self.analyze(model)
+    
+    @staticmethod
+    def analyze(model):
+        """
+        Returns: (每个样本前向FLOPs, 每个样本激活字节数, 参数字节数)
+        """
+        flops = 0
+        activation_bytes = 0
+        for layer in model.layers:
+            out_shape = layer.output_shape[1:]
+            out_elems = int(np.prod(out_shape))
+            itemsize = tf.as_dtype(layer.compute_dtype).size
+            if isinstance(layer, tf.keras.layers.Conv2D):
+                kh, kw, cin, cout = layer.kernel.shape
+                flops += 2 * kh * kw * cin * out_elems
+                flops += out_elems  # bias + 激活
+            elif isinstance(layer, tf.keras.layers.Dense):
+                flops += 2 * layer.kernel.shape[0] * out_elems
+                flops += out_elems
+            elif isinstance(layer, (tf.keras.layers.MaxPooling2D, tf.keras.layers.AveragePooling2D)):
+                flops += out_elems * int(np.prod(layer.pool_size))
+            elif isinstance(layer, tf.keras.layers.Dropout):
+                flops += out_elems
+            activation_bytes += out_elems * itemsize
+        param_bytes = sum(int(np.prod(w.shape)) * w.dtype.size for w in model.weights)
+        return int(flops), int(activation_bytes), int(param_bytes)
+    
+    STREAMS = {'train': 0, 'profile': 1}
+    
+    def latency(self, data_size, epochs=1, cpu_capacity=1.0, batch_size=10, client_id=None,
+                stream='train'):
+        """估计一次本地训练的模拟耗时（秒）；stream: train | profile"""
+        num_batches = -(-data_size // batch_size)
+        compute = self.TRAIN_FLOPS_FACTOR * self.flops_per_sample * data_size / self.flops_per_second
+        # 激活前向写、反向读写；每个batch读写一次参数和梯度
+        memory = (3 * self.bytes_per_sample * data_size
+                  + 3 * self.param_bytes * num_batches) / self.bytes_per_second
+        t = (compute + memory) * epochs / cpu_capacity
+        
+        if not (self.noise or self.drift):
+            return float(t)
+        key = (-1 if client_id is None else int(client_id), self.STREAMS[stream])
+        rng = self._client_rng(key)
+        if self.drift and client_id is not None:
+            factor = self.client_drift.get(key, 1.0) * np.exp(rng.normal(0.0, self.drift))
+            self.client_drift[key] = factor
+            t *= factor
+        if self.noise:
+            t *= np.exp(rng.normal(0.0, self.noise))
+        return float(t)
+    
+    def _client_rng(self, key):
+        client_id, stream = key
+        if key not in self.client_rngs:
+            entropy = [self.seed, stream] if client_id < 0 else [self.seed, client_id, stream]
+            self.client_rngs[key] = np.random.default_rng(entropy)
+        return self.client_rngs[key]
@@ -0,0 +1,44 @@
+import numpy as np
+
+class TierEvaluator:
+    """
+    分层评估：用全局模型在各层级客户端本地验证集（训练时不使用）的分层抽样上评估准确率
+    抽样在初始化时缓存，每次评估只做一次批量前向计算
+    """
+    def __init__(self, model, clients, tiers, samples_per_tier=500, batch_size=1000):
+        self.model = model
+        self.batch_size = batch_size
+        self.tier_ids = sorted(tiers.keys())
+        
+        x_parts, y_parts, t_parts = [], [], []
+        for pos, tier_id in enumerate(self.tier_ids):
+            tier_clients = tiers[tier_id]['clients']
+            # 按客户端分层：每个客户端贡献相同数量的样本
+            per_client = max(1, samples_per_tier // len(tier_clients))
+            for cid in tier_clients:
+                client = clients[cid]
+                if client.y_holdout is None or len(client.y_holdout) == 0:
+                    raise ValueError(f"Client {cid} has no holdout data (holdout_fraction)")
+                n = min(per_client, len(client.y_holdout))
+                idx = np.random.choice(len(client.y_holdout), n, replace=False)
+                x_parts.append(client.x_holdout[idx])
+                y_parts.append(client.y_holdout[idx])
+                t_parts.append(np.full(n, pos))
+        
+        self.x_eval = np.concatenate(x_parts)
+        self.y_eval = np.concatenate(y_parts)
+        self.tier_index = np.concatenate(t_parts)
+        self.tier_counts = np.bincount(self.tier_index, minlength=len(self.tier_ids))
+    
+    def evaluate(self, weights=None):
+        """
+        批量评估所有层级
+        Returns: {tier_id: accuracy}
+        """
+        if weights is not None:
+            self.model.set_weights(weights)
+        probs = self.model.predict(self.x_eval, batch_size=self.batch_size, verbose=0)
+        correct = np.argmax(probs, axis=1) == self.y_eval
+        hits = np.bincount(self.tier_index, weights=correct, minlength=len(self.tier_ids))
+        accs = hits / self.tier_counts
+        return {tier_id: float(accs[pos]) for pos, tier_id in enumerate(self.tier_ids)}
@@ -0,0 +1,260 @@
+"""
+客户端RPC传输（TCP socket）
+消息格式: [header长度 u32][weights长度 u64][header JSON][weights二进制]
+weights二进制: [数组个数 u32] + 每个数组 [dtype字符串长度 u8][dtype][ndim u8][shape u32*ndim][原始字节]
+"""
+
+import json
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import numpy as np
+from core.server import weighted_sum
+
+_FRAME = struct.Struct('!IQ')
+
+def encode_weights(weights):
+    parts = [struct.pack('!I', len(weights))]
+    for w in weights:
+        w = np.require(w, requirements='C')
+        dtype = w.dtype.str.encode()
+        parts.append(struct.pack('!B', len(dtype)) + dtype)
+        parts.append(struct.pack(f'!B{w.ndim}I', w.ndim, *w.shape))
+        parts.append(w.tobytes())
+    return b''.join(parts)
+
+def decode_weights(buf):
+    view = memoryview(buf)
+    (count,) = struct.unpack_from('!I', view, 0)
+    offset = 4
+    weights = []
+    for _ in range(count):
+        (dtype_len,) = struct.unpack_from('!B', view, offset)
+        offset += 1
+        dtype = np.dtype(bytes(view[offset:offset + dtype_len]).decode())
+        offset += dtype_len
+        (ndim,) = struct.unpack_from('!B', view, offset)
+        shape = struct.unpack_from(f'!{ndim}I', view, offset + 1)
+        offset += 1 + 4 * ndim
+        nbytes = dtype.itemsize * int(np.prod(shape))
+        # 拷贝一份，使数组可写且不依赖接收缓冲区
+        weights.append(np.frombuffer(view[offset:offset + nbytes], dtype=dtype).reshape(shape).copy())
+        offset += nbytes
+    return weights
+
+def send_message(sock, header, weights=None):
+    head = json.dumps(header).encode()
+    blob = encode_weights(weights) if weights is not None else b''
+    sock.sendall(_FRAME.pack(len(head), len(blob)) + head + blob)
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    received = 0
+    while received < n:
+        chunk = sock.recv_into(view[received:], n - received)
+        if chunk == 0:
+            raise ConnectionError("Connection closed by peer")
+        received += chunk
+    return buf
+
+def recv_message(sock):
+    """Returns: (header, weights或None)"""
+    head_len, blob_len = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    header = json.loads(_recv_exact(sock, head_len).decode())
+    weights = decode_weights(_recv_exact(sock, blob_len)) if blob_len else None
+    return header, weights
+
+class ClientWorker:
+    """
+    客户端Worker：托管一部分Client，通过socket接收train/evaluate请求
+    train请求中每个客户端完成后立即回传其更新
+    """
+    def __init__(self, clients, host='127.0.0.1', port=0):
+        self.clients = {c.client_id: c for c in clients}
+        worker = self
+        
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                worker._serve_connection(self.request)
+        
+        self.server = socketserver.TCPServer((host, port), Handler)
+        self.address = self.server.server_address
+    
+    def serve_forever(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+    
+    def _serve_connection(self, sock):
+        while True:
+            try:
+                header, weights = recv_message(sock)
+            except ConnectionError:
+                return
+            op = header['op']
+            try:
+                if op == 'info':
+                    send_message(sock, {'data_sizes': {cid: c.data_size
+                                                       for cid, c in self.clients.items()}})
+                elif op == 'train':
+                    for cid in header['client_ids']:
+                        updated, sim_time, loss = self.clients[cid].train(weights, **header['kwargs'])
+                        send_message(sock, {'client_id': cid, 'time': float(sim_time),
+                                            'loss': float(loss)}, updated)
+                    send_message(sock, {'done': True})
+                elif op == 'train_partial':
+                    # 在worker内部完成部分聚合，只回传一份加权和
+                    updates, stats = [], []
+                    for cid in header['client_ids']:
+                        client = self.clients[cid]
+                        updated, sim_time, loss = client.train(weights, **header['kwargs'])
+                        updates.append(updated)
+                        stats.append({'client_id': cid, 'time': float(sim_time),
+                                      'loss': float(loss), 'data_size': client.data_size})
+                    sums, total = weighted_sum(updates, [s['data_size'] for s in stats])
+                    send_message(sock, {'clients': stats, 'total': total}, sums)
+                elif op == 'evaluate':
+                    losses = {cid: float(self.clients[cid].get_loss(weights, header['max_samples']))
+                              for cid in header['client_ids']}
+                    send_message(sock, {'losses': losses})
+                elif op == 'shutdown':
+                    send_message(sock, {'done': True})
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                else:
+                    raise ValueError(f"Unknown op: {op}")
+            except Exception as e:
+                send_message(sock, {'error': f"{type(e).__name__}: {e}"})
+
+class WorkerPool:
+    """
+    训练端：把选中的客户端按所在Worker分组并行下发，按完成顺序流式返回更新
+    """
+    def __init__(self, addresses, timeout=None):
+        self.sockets = []
+        self.route = {}
+        self.data_sizes = {}
+        self.broken = False
+        for host, port in addresses:
+            sock = socket.create_connection((host, port), timeout=timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            send_message(sock, {'op': 'info'})
+            header, _ = self._check(recv_message(sock))
+            for cid, size in header['data_sizes'].items():
+                self.route[int(cid)] = len(self.sockets)
+                self.data_sizes[int(cid)] = size
+            self.sockets.append(sock)
+    
+    @staticmethod
+    def _check(message):
+        header, weights = message
+        if 'error' in header:
+            raise RuntimeError(f"Worker error: {header['error']}")
+        return header, weights
+    
+    def _group(self, client_ids):
+        if self.broken:
+            raise RuntimeError("WorkerPool connection is broken; reconnect to the workers")
+        groups = {}
+        for cid in client_ids:
+            if cid not in self.route:
+                raise KeyError(f"Client {cid} is not hosted by any worker")
+            groups.setdefault(self.route[cid], []).append(int(cid))
+        return groups
+    
+    def _dispatch(self, groups, request):
+        """
+        每个worker一个线程执行request(sock, cids, put)，结果放入队列
+        Yields: 队列中的结果；出错时先等待所有线程结束再抛出，保证各socket的消息流保持同步
+        """
+        results = queue.Queue()
+        
+        def run(sock, cids):
+            try:
+                request(sock, cids, results.put)
+            except RuntimeError as e:
+                # worker报告的错误：该请求已结束，消息流仍同步
+                results.put(e)
+            except Exception as e:
+                # 传输错误：消息流状态未知，后续请求不再使用这些连接
+                self.broken = True
+                results.put(e)
+            finally:
+                results.put(None)
+        
+        threads = [threading.Thread(target=run, args=(self.sockets[w], cids), daemon=True)
+                   for w, cids in groups.items()]
+        for t in threads:
+            t.start()
+        error = None
+        finished = 0
+        try:
+            while finished < len(threads):
+                item = results.get()
+                if item is None:
+                    finished += 1
+                elif isinstance(item, Exception):
+                    error = error or item
+                elif error is None:
+                    yield item
+        finally:
+            for t in threads:
+                t.join()
+        if error is not None:
+            raise error
+    
+    def train(self, client_ids, global_weights, **train_kwargs):
+        """
+        Yields: (client_id, updated_weights, simulated_time, loss)，按完成顺序
+        """
+        def request(sock, cids, put):
+            send_message(sock, {'op': 'train', 'client_ids': cids, 'kwargs': train_kwargs},
+                         global_weights)
+            while True:
+                header, weights = self._check(recv_message(sock))
+                if header.get('done'):
+                    return
+                put((header['client_id'], weights, header['time'], header['loss']))
+        
+        return self._dispatch(self._group(client_ids), request)
+    
+    def train_partial(self, client_ids, global_weights, **train_kwargs):
+        """
+        每个worker训练其客户端并在本地做部分聚合
+        Yields: (客户端统计列表, (加权和, 样本总数))，按worker完成顺序
+        """
+        def request(sock, cids, put):
+            send_message(sock, {'op': 'train_partial', 'client_ids': cids,
+                                'kwargs': train_kwargs}, global_weights)
+            header, sums = self._check(recv_message(sock))
+            put((header['clients'], (sums, header['total'])))
+        
+        return self._dispatch(self._group(client_ids), request)
+    
+    def get_losses(self, client_ids, global_weights, max_samples=None):
+        """
+        在各worker上并行计算全局模型在客户端本地数据（可抽样）上的损失
+        Returns: {client_id: loss}
+        """
+        def request(sock, cids, put):
+            send_message(sock, {'op': 'evaluate', 'client_ids': cids,
+                                'max_samples': max_samples}, global_weights)
+            header, _ = self._check(recv_message(sock))
+            put(header['losses'])
+        
+        losses = {}
+        for part in self._dispatch(self._group(client_ids), request):
+            losses.update({int(cid): loss for cid, loss in part.items()})
+        return losses
+    
+    def close(self, shutdown_workers=False):
+        for sock in self.sockets:
+            if shutdown_workers:
+                send_message(sock, {'op': 'shutdown'})
+                recv_message(sock)
+            sock.close()
+        self.sockets = []
@@ -1,8 +1,38 @@
 import tensorflow as tf
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+def weighted_sum(client_weights_list, client_data_sizes):
+    """
+    部分聚合: (sum(w_i * n_i), sum(n_i))
+    可在层级/worker内部计算，再由merge_partials合并
+    """
+    sums = []
+    for layer_idx in range(len(client_weights_list[0])):
+        # 按层原地累加，保持权重dtype（float32），不堆叠所有客户端
+        acc = np.zeros_like(client_weights_list[0][layer_idx])
+        scratch = np.empty_like(acc)
+        for n, weights in zip(client_data_sizes, client_weights_list):
+            np.multiply(weights[layer_idx], acc.dtype.type(n), out=scratch)
+            acc += scratch
+        sums.append(acc)
+    return sums, sum(client_data_sizes)
+
+def chunk_groups(num_clients, num_groups):
+    """把cohort按顺序切成num_groups个大小相近的块，返回每个客户端的组编号"""
+    return (np.arange(num_clients) * min(num_groups, num_clients) // max(num_clients, 1)).tolist()
+
+def merge_partials(partials):
+    """合并多个部分聚合结果"""
+    partials = list(partials)
+    sums = [layer.copy() for layer in partials[0][0]]
+    for partial_sums, _ in partials[1:]:
+        for acc, layer in zip(sums, partial_sums):
+            acc += layer
+    return sums, sum(total for _, total in partials)
 
 class FederatedServer:
-    def __init__(self, model, test_data):
+    def __init__(self, model, test_data, max_workers=None):
         self.global_model = model
         self.x_test, self.y_test = test_data
         self.global_model.compile(
@@ -10,23 +40,34 @@ class FederatedServer:
             loss='sparse_categorical_crossentropy',
             metrics=['accuracy']
         )
+        # 分层聚合时并行计算各组的部分和（首次分组聚合时创建）
+        self.max_workers = max_workers
+        self._pool = None
     
-    def aggregate(self, client_weights_list, client_data_sizes):
+    def aggregate(self, client_weights_list, client_data_sizes, groups=None):
         """
         FedAvg聚合: w_global = sum(w_i * n_i) / sum(n_i)
+        groups给出时（每个客户端的组编号，如chunk_groups）先并行计算每组的部分和再合并，结果与扁平聚合相同
         """
-        total_size = sum(client_data_sizes)
-        
-        # 加权平均
-        new_weights = []
-        for layer_idx in range(len(client_weights_list[0])):
-            layer_weights = np.array([
-                weights[layer_idx] * client_data_sizes[i] 
-                for i, weights in enumerate(client_weights_list)
-            ])
-            new_layer_weights = np.sum(layer_weights, axis=0) / total_size
-            new_weights.append(new_layer_weights)
-        
+        if groups is None:
+            partials = [weighted_sum(client_weights_list, client_data_sizes)]
+        else:
+            members = {}
+            for i, g in enumerate(groups):
+                members.setdefault(g, []).append(i)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            partials = list(self._pool.map(
+                lambda idx: weighted_sum([client_weights_list[i] for i in idx],
+                                         [client_data_sizes[i] for i in idx]),
+                members.values()
+            ))
+        return self.apply_partials(partials)
+    
+    def apply_partials(self, partials):
+        """由部分聚合结果（本地分组或远程worker计算）得到新的全局权重"""
+        sums, total_size = merge_partials(partials)
+        new_weights = [layer / layer.dtype.type(total_size) for layer in sums]
         self.global_model.set_weights(new_weights)
         return new_weights
     
@@ -39,3 +80,8 @@ class FederatedServer:
     
     def get_weights(self):
         return self.global_model.get_weights()
+    
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -5,14 +5,28 @@ class TieringSystem:
         self.num_tiers = num_tiers
         self.tiers = {}
     
-    def profile_clients(self, clients, global_weights, sync_rounds=3):
-        """性能分析：测量客户端延迟"""
+    def profile_clients(self, clients, global_weights, sync_rounds=3, executor=None):
+        """
+        性能分析：测量客户端延迟
+        executor给出时（core.rpc.WorkerPool）在托管客户端的worker上实测，与训练轮次的计时来自同一台机器
+        """
+        if executor is not None and not any(c.cost_model for c in clients):
+            times = {c.client_id: [] for c in clients}
+            for _ in range(sync_rounds):
+                for cid, _, t, _ in executor.train(list(times), global_weights, epochs=1):
+                    times[cid].append(t)
+            return {cid: np.mean(ts) for cid, ts in times.items()}
+        
         latencies = {} 
         for client in clients:
             times = []
             for _ in range(sync_rounds):  
-                _, t, _ = client.train(global_weights, epochs=1)    
-                ##这里只要部分返回值t，即可就是时间，其他的都不要  client.train 返回了部分参数
+                if client.cost_model:
+                    # 解析式延迟模型：无需实际训练
+                    t = client.estimate_time(epochs=1, stream='profile')
+                else:
+                    _, t, _ = client.train(global_weights, epochs=1)    
+                    ##这里只要部分返回值t，即可就是时间，其他的都不要  client.train 返回了部分参数
                 times.append(t) 
             latencies[client.client_id] = np.mean(times)  ##计算平均值 通过计算平均值，可以得出该客户端在多轮训练中的平均延迟。
         return latencies
@@ -36,14 +50,49 @@ class TieringSystem:
             }
         return self.tiers
 
+def build_alias_table(probs):
+    """Vose别名表：O(n)构建，之后每次采样O(1)"""
+    n = len(probs)
+    scaled = (np.asarray(probs, dtype=np.float64) * n / np.sum(probs)).tolist()
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, v in enumerate(scaled) if v < 1.0]
+    large = [i for i, v in enumerate(scaled) if v >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = scaled[l] + scaled[s] - 1.0
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+    # 剩余项由浮点误差导致，概率视为1
+    return np.array(prob), np.array(alias)
+
+def sample_alias(prob, alias, size):
+    """从别名表中一次性抽取size个样本（返回表内下标）"""
+    idx = np.random.randint(0, len(prob), size=size)
+    coin = np.random.random_sample(size)
+    return np.where(coin < prob[idx], idx, alias[idx])
+
 class AdaptiveScheduler:
     def __init__(self, tiers, interval=50, initial_credits=10):
+        if initial_credits <= 0:
+            raise ValueError(f"initial_credits must be positive, got {initial_credits}")
         self.tiers = tiers
         self.num_tiers = len(tiers)
         self.interval = interval
-        self.credits = {i: initial_credits for i in range(self.num_tiers)}
-        self.probs = {i: 1.0/self.num_tiers for i in range(self.num_tiers)}
+        self.initial_credits = initial_credits
+        self.credits = np.full(self.num_tiers, initial_credits, dtype=np.int64)
+        self.probs = np.full(self.num_tiers, 1.0/self.num_tiers)
         self.tier_accuracies = {i: [] for i in range(self.num_tiers)}
+        # 别名表只覆盖有Credits的层级，概率或可选集合变化时才重建
+        self._eligible = None
+        self._alias_prob = None
+        self._alias = None
+        self._table_dirty = True
     
     def select_tier(self, current_round):
         """选择层级（带Credits约束）"""
@@ -51,18 +100,54 @@ class AdaptiveScheduler:
         if current_round > 0 and current_round % self.interval == 0:
             self._update_probabilities()
         
-        # 选择层级
-        while True:
-            tier_id = np.random.choice(
-                list(self.probs.keys()),
-                p=list(self.probs.values())
-            )
-            if self.credits[tier_id] > 0:
-                self.credits[tier_id] -= 1
-                return tier_id
-            # 如果所有Credits耗尽，重置
-            if all(c == 0 for c in self.credits.values()):
-                self._reset_credits()
+        tier_id = int(self._draw(1)[0])
+        self._consume(np.array([tier_id]))
+        return tier_id
+    
+    def select_tiers(self, start_round, num_rounds):
+        """
+        预生成[start_round, start_round+num_rounds)的层级调度
+        与逐轮调用select_tier同分布（随机数消耗方式不同，具体序列不一定相同）；
+        跨越interval边界时按当时已有的准确率更新概率
+        """
+        schedule = np.empty(num_rounds, dtype=np.int64)
+        pos = 0
+        while pos < num_rounds:
+            current_round = start_round + pos
+            if current_round > 0 and current_round % self.interval == 0:
+                self._update_probabilities()
+            # 本段不跨越下一个interval边界
+            next_update = (current_round // self.interval + 1) * self.interval
+            segment_end = min(start_round + num_rounds, next_update)
+            while current_round < segment_end:
+                self._ensure_credits()
+                # 每个可选层级至少有m个Credits，因此连抽m次不会出现Credits为负
+                m = min(segment_end - current_round,
+                        int(self.credits[self.credits > 0].min()))
+                tiers = self._draw(m)
+                self._consume(tiers)
+                schedule[pos:pos + m] = tiers
+                pos += m
+                current_round += m
+        return schedule.tolist()
+    
+    def _draw(self, size):
+        self._ensure_credits()
+        if self._table_dirty:
+            self._eligible = np.flatnonzero(self.credits > 0)
+            self._alias_prob, self._alias = build_alias_table(self.probs[self._eligible])
+            self._table_dirty = False
+        return self._eligible[sample_alias(self._alias_prob, self._alias, size)]
+    
+    def _consume(self, tier_ids):
+        self.credits -= np.bincount(tier_ids, minlength=self.num_tiers)
+        if np.any(self.credits[tier_ids] == 0):
+            self._table_dirty = True
+    
+    def _ensure_credits(self):
+        # 如果所有Credits耗尽，重置
+        if not np.any(self.credits > 0):
+            self._reset_credits()
     
     def _update_probabilities(self):
         """基于准确率调整概率（降低表现差的层级）"""
@@ -72,12 +157,12 @@ class AdaptiveScheduler:
                 if len(accs) >= 2 and accs[-1] < accs[-2]:
                     self.probs[tier_id] *= 0.9  # 降低概率
             # 归一化
-            total = sum(self.probs.values())
-            self.probs = {k: v/total for k, v in self.probs.items()}
+            self.probs /= self.probs.sum()
+            self._table_dirty = True
     
     def _reset_credits(self):
-        for tier_id in self.credits:
-            self.credits[tier_id] = 10
+        self.credits[:] = self.initial_credits
+        self._table_dirty = True
     
     def update_tier_accuracy(self, tier_id, accuracy):
         self.tier_accuracies[tier_id].append(accuracy)
@@ -1,21 +1,22 @@
 import tensorflow as tf
 import numpy as np
 from tensorflow.keras.datasets import mnist, fashion_mnist, cifar10
+from data.partition import shard_partition, class_partition
 
-def load_dataset(name):
-    """加载数据集"""
+def load_dataset(name, dtype=np.float32):
+    """加载数据集（像素归一化到[0,1]，默认float32）"""
     if name == 'mnist':
         (x_train, y_train), (x_test, y_test) = mnist.load_data()
-        x_train = x_train[..., np.newaxis] / 255.0
-        x_test = x_test[..., np.newaxis] / 255.0
+        x_train = _normalize(x_train[..., np.newaxis], dtype)
+        x_test = _normalize(x_test[..., np.newaxis], dtype)
     elif name == 'fashion_mnist':
         (x_train, y_train), (x_test, y_test) = fashion_mnist.load_data()
-        x_train = x_train[..., np.newaxis] / 255.0
-        x_test = x_test[..., np.newaxis] / 255.0
+        x_train = _normalize(x_train[..., np.newaxis], dtype)
+        x_test = _normalize(x_test[..., np.newaxis], dtype)
     elif name == 'cifar10':
         (x_train, y_train), (x_test, y_test) = cifar10.load_data()
-        x_train = x_train / 255.0
-        x_test = x_test / 255.0
+        x_train = _normalize(x_train, dtype)
+        x_test = _normalize(x_test, dtype)
         y_train = y_train.squeeze()
         y_test = y_test.squeeze()
     else:
@@ -23,60 +24,42 @@ def load_dataset(name):
     
     return (x_train, y_train), (x_test, y_test)
 
-def create_non_iid_split(x, y, num_clients, shards_per_client=2):
+def _normalize(x, dtype):
+    # 直接转换到目标dtype再原地除，避免产生float64中间数组
+    x = x.astype(dtype)
+    x /= 255
+    return x
+
+def create_non_iid_split(x, y, num_clients, shards_per_client=2, seed=None):
     """
     Non-IID划分 (MNIST/Fashion-MNIST)
     每个客户端最多2个类别
     """
-    # 按标签排序
-    sorted_idx = np.argsort(y)
-    x_sorted = x[sorted_idx]
-    y_sorted = y[sorted_idx]
-    
-    # 分成100个shard
-    num_shards = 100
-    shard_size = len(x_sorted) // num_shards
-    
-    # 随机分配shard给客户端
-    shard_indices = np.arange(num_shards)
-    np.random.shuffle(shard_indices)
-    
-    client_data = []
-    for i in range(num_clients):
-        client_shards = shard_indices[i*shards_per_client:(i+1)*shards_per_client]
-        client_x = []
-        client_y = []
-        for shard_id in client_shards:
-            start = shard_id * shard_size
-            end = start + shard_size if shard_id < num_shards - 1 else len(x_sorted)
-            client_x.append(x_sorted[start:end])
-            client_y.append(y_sorted[start:end])
-        
-        client_x = np.concatenate(client_x)
-        client_y = np.concatenate(client_y)
-        client_data.append((client_x, client_y))
-    
-    return client_data
+    return split_by_indices(x, y, shard_partition(y, num_clients, shards_per_client, seed))
 
-def create_non_iid_cifar(x, y, num_clients, classes_per_client=5):
+def create_non_iid_cifar(x, y, num_clients, classes_per_client=5, seed=None):
     """
     Non-IID划分 (CIFAR-10)
     每个客户端5个类别
     """
-    num_classes = 10
-    class_indices = [np.where(y == i)[0] for i in range(num_classes)]
-    
-    client_data = []
-    for i in range(num_clients):
-        # 为每个客户端随机选择5个类别
-        selected_classes = np.random.choice(num_classes, classes_per_client, replace=False)
-        client_idx = []
-        for c in selected_classes:
-            # 从每个类别中均匀取样
-            samples_per_class = len(class_indices[c]) // (num_clients // 2)
-            client_idx.extend(np.random.choice(class_indices[c], samples_per_class, replace=False))
-        
-        client_idx = np.array(client_idx)
-        client_data.append((x[client_idx], y[client_idx]))
-    
-    return client_data
+    return split_by_indices(x, y, class_partition(y, num_clients, classes_per_client, seed))
+
+def split_by_indices(x, y, client_indices):
+    """根据data.partition返回的下标数组取出各客户端数据"""
+    return [(x[idx], y[idx]) for idx in client_indices]
+
+def split_holdout(data, fraction, seed, client_id):
+    """
+    从客户端数据中划出本地验证集（训练时不使用）
+    按(seed, client_id)生成随机数，与其他客户端的创建顺序无关，worker与服务器结果一致
+    Returns: (train_data, holdout_data)
+    """
+    x, y = data
+    num_holdout = int(round(len(y) * fraction))
+    if fraction > 0:
+        num_holdout = max(num_holdout, 1)
+    # 至少保留一个训练样本
+    num_holdout = min(num_holdout, len(y) - 1)
+    perm = np.random.default_rng([seed, client_id]).permutation(len(y))
+    holdout_idx, train_idx = perm[:num_holdout], perm[num_holdout:]
+    return (x[train_idx], y[train_idx]), (x[holdout_idx], y[holdout_idx])
@@ -0,0 +1,121 @@
+"""
+Non-IID数据划分
+所有函数只返回每个客户端的样本下标数组（list of np.ndarray），不复制数据；
+对客户端的计算全部向量化，只在类别维度上循环。传入相同seed结果可复现，
+seed为None时从全局np.random派生（受main.py中set_seed控制）。
+每个客户端至少min_size个样本，无法满足时抛出ValueError，不会返回空客户端。
+"""
+
+import numpy as np
+
+def _rng(seed):
+    if seed is None:
+        seed = np.random.randint(0, 2**31 - 1)
+    return np.random.default_rng(seed)
+
+def _group_by_owner(owner, indices, num_clients):
+    """按客户端编号把(owner, index)对分组为下标数组列表"""
+    order = np.argsort(owner, kind='stable')
+    counts = np.bincount(owner, minlength=num_clients)
+    return np.split(indices[order], np.cumsum(counts)[:-1])
+
+def _check_min_size(parts, min_size):
+    sizes = np.array([len(p) for p in parts])
+    if sizes.min() < min_size:
+        raise ValueError(f"{int((sizes < min_size).sum())} of {len(parts)} clients have fewer "
+                         f"than {min_size} samples")
+    return parts
+
+def shard_partition(y, num_clients, shards_per_client=2, seed=None):
+    """
+    按标签排序后切成 num_clients * shards_per_client 个shard，随机分给客户端
+    （MNIST/Fashion-MNIST，每个客户端最多shards_per_client个类别）
+    """
+    rng = _rng(seed)
+    num_shards = num_clients * shards_per_client
+    shard_size = len(y) // num_shards
+    if shard_size == 0:
+        raise ValueError(f"Not enough samples ({len(y)}) for {num_shards} shards")
+    
+    sorted_idx = np.argsort(y, kind='stable')[:num_shards * shard_size]
+    shards = sorted_idx.reshape(num_shards, shard_size)[rng.permutation(num_shards)]
+    return list(shards.reshape(num_clients, shards_per_client * shard_size))
+
+def class_partition(y, num_clients, classes_per_client=5, seed=None, min_size=1):
+    """
+    每个客户端随机选择classes_per_client个类别（CIFAR-10）
+    每个类别的样本在选中它的客户端之间不重叠地均分
+    """
+    rng = _rng(seed)
+    num_classes = int(y.max()) + 1
+    # 每行取随机排列的前k个，即每个客户端无放回选k个类别
+    chosen = np.argsort(rng.random((num_clients, num_classes)), axis=1)[:, :classes_per_client]
+    holder_client = np.repeat(np.arange(num_clients), classes_per_client)
+    holder_class = chosen.ravel()
+    
+    owners, indices = [], []
+    for c in range(num_classes):
+        holders = holder_client[holder_class == c]
+        if len(holders) == 0:
+            continue
+        class_idx = rng.permutation(np.flatnonzero(y == c))
+        # 第p个样本分给第 p*m//n 个持有者
+        chunk = np.arange(len(class_idx)) * len(holders) // len(class_idx)
+        owners.append(holders[chunk])
+        indices.append(class_idx)
+    parts = _group_by_owner(np.concatenate(owners), np.concatenate(indices), num_clients)
+    return _check_min_size(parts, min_size)
+
+def _fill_min_size(owner, num_clients, min_size, rng):
+    """
+    把样本数多于min_size的客户端中随机挑出的样本移给不足min_size的客户端
+    （调用方保证样本总数 >= num_clients * min_size）
+    """
+    counts = np.bincount(owner, minlength=num_clients)
+    deficit = np.maximum(min_size - counts, 0)
+    if deficit.sum() == 0:
+        return owner
+    # 每个样本在其客户端内的序号；序号 >= min_size 的样本移走后不影响原客户端
+    order = np.argsort(owner, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.empty(len(owner), dtype=np.int64)
+    rank[order] = np.arange(len(owner)) - starts[owner[order]]
+    movable = np.flatnonzero(rank >= min_size)
+    moved = rng.choice(movable, int(deficit.sum()), replace=False)
+    owner = owner.copy()
+    owner[moved] = rng.permutation(np.repeat(np.arange(num_clients), deficit))
+    return owner
+
+def dirichlet_partition(y, num_clients, alpha=0.5, seed=None, min_size=1):
+    """
+    标签分布倾斜：每个类别按 Dirichlet(alpha) 比例分给各客户端
+    alpha越小越Non-IID；不足min_size的客户端从样本多的客户端随机补齐
+    """
+    if num_clients * min_size > len(y):
+        raise ValueError(f"Not enough samples ({len(y)}) for {num_clients} clients "
+                         f"with min_size={min_size}")
+    rng = _rng(seed)
+    num_classes = int(y.max()) + 1
+    proportions = rng.dirichlet(np.full(num_clients, alpha), size=num_classes)
+    
+    owners, indices = [], []
+    for c in range(num_classes):
+        class_idx = rng.permutation(np.flatnonzero(y == c))
+        counts = rng.multinomial(len(class_idx), proportions[c])
+        owners.append(np.repeat(np.arange(num_clients), counts))
+        indices.append(class_idx)
+    owner = _fill_min_size(np.concatenate(owners), num_clients, min_size, rng)
+    return _group_by_owner(owner, np.concatenate(indices), num_clients)
+
+def quantity_partition(num_samples, num_clients, alpha=0.5, seed=None, min_size=1):
+    """
+    数量倾斜：标签IID，每个客户端先保留min_size个样本，其余按 Dirichlet(alpha) 比例分配
+    """
+    if num_clients * min_size > num_samples:
+        raise ValueError(f"Not enough samples ({num_samples}) for {num_clients} clients "
+                         f"with min_size={min_size}")
+    rng = _rng(seed)
+    extra = rng.multinomial(num_samples - num_clients * min_size,
+                            rng.dirichlet(np.full(num_clients, alpha)))
+    counts = extra + min_size
+    return np.split(rng.permutation(num_samples), np.cumsum(counts)[:-1])
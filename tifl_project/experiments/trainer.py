@@ -1,15 +1,33 @@
 import numpy as np
 import time
 from tqdm import tqdm
+from core.server import chunk_groups
 
 class FederatedTrainer:
-    def __init__(self, clients, server, config, strategy_name, tiers=None, scheduler=None):
+    def __init__(self, clients, server, config, strategy_name, tiers=None, scheduler=None,
+                 evaluator=None, executor=None):
         self.clients = clients
         self.server = server
         self.config = config
         self.strategy_name = strategy_name
         self.tiers = tiers
         self.scheduler = scheduler
+        self.evaluator = evaluator
+        # executor给出时（如core.rpc.WorkerPool）把客户端训练下发到远程worker
+        self.executor = executor
+        if executor is not None:
+            self._check_worker_data(executor.data_sizes)
+        
+        # 聚合拓扑: flat | grouped（本轮cohort切成aggregation_groups块，并行部分和）| worker（在worker上部分聚合）
+        # 不按层级分组：除vanilla外每轮的cohort都来自同一层级，按层级分组只有一组
+        self.aggregation = config.get('aggregation', 'flat')
+        if self.aggregation not in ('flat', 'grouped', 'worker'):
+            raise ValueError(f"Unknown aggregation topology: {self.aggregation}")
+        if self.aggregation == 'worker' and executor is None:
+            raise ValueError("aggregation='worker' requires an executor (--workers)")
+        self.aggregation_groups = config.get('aggregation_groups', 4)
+        if self.aggregation == 'grouped' and self.aggregation_groups < 1:
+            raise ValueError(f"aggregation_groups must be positive, got {self.aggregation_groups}")
         
         # 结果记录
         self.metrics = {
@@ -17,23 +35,45 @@ class FederatedTrainer:
             'accuracy': [],
             'loss': [],
             'training_time': [],
-            'wall_clock_time': []
+            'simulated_time': [],
+            'wall_clock_time': [],
+            'time_to_target': None,
+            'stop_reason': 'num_rounds'
         }
     
     def train(self):
         """执行联邦学习训练"""
-        from strategies.selector import ClientSelector
+        from strategies.selector import ClientSelector, LossCache
         
         num_rounds = self.config['num_rounds']
         clients_per_round = self.config['clients_per_round']
+        tiered_adaptive = self.strategy_name in ('adaptive', 'loss_aware')
+        
+        # 目标准确率与平台期早停（可选）
+        target_accuracy = self.config.get('target_accuracy')
+        patience = self.config.get('plateau_patience', 0)
+        min_delta = self.config.get('plateau_min_delta', 0.0)
+        best_accuracy = -1.0
+        rounds_since_best = 0
+        simulated_total = 0.0
+        
+        if self.strategy_name == 'loss_aware':
+            loss_cache = LossCache(max_age=self.config['loss_cache_ttl'],
+                                   samples_per_client=self.config['loss_eval_samples'])
         
         print(f"\n{'='*60}")
         print(f"Training: {self.strategy_name} strategy")
         print(f"Rounds: {num_rounds}, Clients/round: {clients_per_round}")
+        if target_accuracy is not None:
+            print(f"Target accuracy: {target_accuracy}")
         print(f"{'='*60}\n")
         
         total_start = time.time()
         
+        # 分层评估基线（adaptive策略，每interval轮更新一次）
+        if tiered_adaptive and self.evaluator:
+            self._update_tier_accuracies()
+        
         for round_num in tqdm(range(num_rounds), desc="Training"):
             round_start = time.time()
             
@@ -50,6 +90,13 @@ class FederatedTrainer:
                 selected_ids, tier_id = ClientSelector.adaptive(
                     self.scheduler, self.tiers, clients_per_round, round_num
                 )
+            elif self.strategy_name == 'loss_aware':
+                selected_ids, tier_id = ClientSelector.loss_aware(
+                    self.scheduler, self.tiers, self.clients, self.server.global_model,
+                    loss_cache, clients_per_round, round_num,
+                    candidate_factor=self.config['loss_candidate_factor'],
+                    executor=self.executor
+                )
             
             # 2. 客户端训练
             global_weights = self.server.get_weights()
@@ -57,15 +104,37 @@ class FederatedTrainer:
             client_sizes = []
             client_times = []
             
-            for cid in selected_ids:
-                client = self.clients[cid]
-                weights, train_time, _ = client.train(global_weights)
-                client_weights.append(weights)
-                client_sizes.append(client.data_size)
-                client_times.append(train_time)
+            if self.aggregation == 'worker':
+                # 各worker本地完成部分聚合，服务器只合并
+                partials = []
+                for stats, partial in self.executor.train_partial(selected_ids, global_weights):
+                    partials.append(partial)
+                    for st in stats:
+                        client_times.append(st['time'])
+                        if self.strategy_name == 'loss_aware':
+                            loss_cache.invalidate(st['client_id'])
+            else:
+                if self.executor:
+                    updates = self.executor.train(selected_ids, global_weights)
+                else:
+                    updates = ((cid, *self.clients[cid].train(global_weights)) for cid in selected_ids)
+                
+                for cid, weights, train_time, _ in updates:
+                    client_weights.append(weights)
+                    client_sizes.append(self.executor.data_sizes[cid] if self.executor
+                                        else self.clients[cid].data_size)
+                    client_times.append(train_time)
+                    if self.strategy_name == 'loss_aware':
+                        loss_cache.invalidate(cid)
             
             # 3. 聚合
-            self.server.aggregate(client_weights, client_sizes)
+            if self.aggregation == 'worker':
+                self.server.apply_partials(partials)
+            elif self.aggregation == 'grouped':
+                groups = chunk_groups(len(client_weights), self.aggregation_groups)
+                self.server.aggregate(client_weights, client_sizes, groups)
+            else:
+                self.server.aggregate(client_weights, client_sizes)
             
             # 4. 评估
             accuracy, loss = self.server.evaluate()
@@ -73,20 +142,64 @@ class FederatedTrainer:
             # 5. 记录指标
             round_time = time.time() - round_start
             wall_time = time.time() - total_start
+            # 模拟时间：每轮由最慢的被选客户端决定
+            simulated_total += max(client_times)
             
             self.metrics['round'].append(round_num)
             self.metrics['accuracy'].append(float(accuracy))
             self.metrics['loss'].append(float(loss))
             self.metrics['training_time'].append(max(client_times))
+            self.metrics['simulated_time'].append(simulated_total)
             self.metrics['wall_clock_time'].append(wall_time)
             
-            # 6. 更新调度器（adaptive策略）
-            if self.strategy_name == 'adaptive' and self.scheduler:
-                self.scheduler.update_tier_accuracy(tier_id, accuracy)
+            # 6. 更新调度器（adaptive/loss_aware策略）
+            if tiered_adaptive and self.scheduler:
+                if self.evaluator:
+                    if (round_num + 1) % self.scheduler.interval == 0:
+                        self._update_tier_accuracies()
+                else:
+                    self.scheduler.update_tier_accuracy(tier_id, accuracy)
             
             # 打印进度
             if (round_num + 1) % 50 == 0:
                 print(f"Round {round_num+1}: Acc={accuracy:.4f}, Loss={loss:.4f}, Time={round_time:.2f}s")
+            
+            # 7. 目标准确率 / 平台期检查
+            if target_accuracy is not None and accuracy >= target_accuracy:
+                self.metrics['time_to_target'] = {
+                    'target': target_accuracy,
+                    'round': round_num,
+                    'simulated_time': simulated_total,
+                    'wall_clock_time': wall_time
+                }
+                self.metrics['stop_reason'] = 'target'
+                print(f"Target accuracy {target_accuracy} reached at round {round_num+1} "
+                      f"(simulated {simulated_total:.2f}s, wall {wall_time:.2f}s)")
+                break
+            
+            if accuracy > best_accuracy + min_delta:
+                best_accuracy = accuracy
+                rounds_since_best = 0
+            else:
+                rounds_since_best += 1
+            if patience and rounds_since_best >= patience:
+                self.metrics['stop_reason'] = 'plateau'
+                print(f"No improvement for {patience} rounds, stopping at round {round_num+1}")
+                break
         
         print(f"\nTraining completed! Total time: {time.time()-total_start:.2f}s")
         return self.metrics
+    
+    def _update_tier_accuracies(self):
+        """用当前全局模型评估每个层级，结果交给调度器"""
+        tier_accs = self.evaluator.evaluate()
+        for tid, acc in tier_accs.items():
+            self.scheduler.update_tier_accuracy(tid, acc)
+    
+    def _check_worker_data(self, worker_sizes):
+        """worker与服务器的数据划分必须一致（相同的config/seed/dtype），否则聚合权重会错"""
+        mismatched = [c.client_id for c in self.clients
+                      if worker_sizes.get(c.client_id) != c.data_size]
+        if mismatched:
+            raise ValueError(f"Worker data does not match server for clients {mismatched[:10]}; "
+                             f"check that workers use the same config and seed")
@@ -13,26 +13,55 @@ import os
 from datetime import datetime
 
 # 导入模块
-from data.loader import load_dataset, create_non_iid_split, create_non_iid_cifar
+from data.loader import load_dataset, create_non_iid_split, create_non_iid_cifar, split_by_indices, split_holdout
+from data.partition import dirichlet_partition, quantity_partition
 from models.networks import get_model
+from models.precision import set_dtype_policy, data_dtype
 from core.client import Client
 from core.server import FederatedServer
 from core.tiering import TieringSystem, AdaptiveScheduler
+from core.cost_model import CostModel
+from core.evaluation import TierEvaluator
 from experiments.trainer import FederatedTrainer
+from core.rpc import WorkerPool
+
+def load_config(config_path, dataset_name):
+    """合并common与数据集配置"""
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    dataset_config = {**config['common'], **config['datasets'][dataset_name]}
+    dataset_config['dataset'] = dataset_name  # 添加数据集名称
+    return dataset_config
+
+def parse_workers(spec):
+    """'host:port,host:port' -> [(host, port), ...]"""
+    addresses = []
+    for item in spec.split(','):
+        host, port = item.rsplit(':', 1)
+        addresses.append((host, int(port)))
+    return addresses
 
 def set_seed(seed):
     """设置随机种子"""
     np.random.seed(seed)
     tf.random.set_seed(seed)
 
-def setup_clients(dataset_name, num_clients, cpu_alloc, config):
-    """创建客户端"""
+def setup_clients(dataset_name, num_clients, cpu_alloc, config, client_ids=None):
+    """创建客户端（client_ids给出时只创建这部分客户端，供worker使用）"""
     print(f"Loading {dataset_name} dataset...")
-    (x_train, y_train), (x_test, y_test) = load_dataset(dataset_name)
+    (x_train, y_train), (x_test, y_test) = load_dataset(dataset_name, data_dtype(config['dtype']))
     
     # Non-IID划分
     print("Creating Non-IID split...")
-    if dataset_name in ['mnist', 'fashion_mnist']:
+    if config['partition'] == 'dirichlet':
+        client_data = split_by_indices(x_train, y_train, dirichlet_partition(
+            y_train, num_clients, config['dirichlet_alpha'],
+            min_size=config['min_client_samples']))
+    elif config['partition'] == 'quantity':
+        client_data = split_by_indices(x_train, y_train, quantity_partition(
+            len(y_train), num_clients, config['dirichlet_alpha'],
+            min_size=config['min_client_samples']))
+    elif dataset_name in ['mnist', 'fashion_mnist']:
         client_data = create_non_iid_split(x_train, y_train, num_clients, 
                                           config['non_iid_shards'])
     else:  # cifar10
@@ -42,20 +71,34 @@ def setup_clients(dataset_name, num_clients, cpu_alloc, config):
     # 创建模型
     model = get_model(dataset_name)
     
+    # 延迟模型：measured（实测时间）| analytical（由模型FLOPs推导）
+    cost_model = None
+    if config['timing'] == 'analytical':
+        cost_model = CostModel(model, seed=config['seed'], **config['cost_model'])
+        print(f"Cost model: {cost_model.flops_per_sample/1e6:.1f} MFLOPs/sample (forward)")
+    
     # 创建客户端
-    print(f"Creating {num_clients} clients...")
+    print(f"Creating {num_clients if client_ids is None else len(client_ids)} clients...")
     clients = []
     clients_per_group = num_clients // len(cpu_alloc)
     
     for i in range(num_clients):
+        if client_ids is not None and i not in client_ids:
+            continue
         group_id = min(i // clients_per_group, len(cpu_alloc) - 1)
         cpu_capacity = cpu_alloc[group_id]
         
+        # 本地验证集只用于分层评估，不参与训练
+        train_data, holdout_data = split_holdout(client_data[i], config['holdout_fraction'],
+                                                 config['seed'], i)
+        
         client = Client(
             client_id=i,
-            data=client_data[i],
+            data=train_data,
             model=model,
-            cpu_capacity=cpu_capacity
+            cpu_capacity=cpu_capacity,
+            cost_model=cost_model,
+            holdout=holdout_data
         )
         clients.append(client)
     
@@ -66,21 +109,21 @@ def main():
     parser.add_argument('--dataset', type=str, required=True,
                        choices=['mnist', 'fashion_mnist', 'cifar10'])
     parser.add_argument('--strategy', type=str, required=True,
-                       choices=['vanilla', 'uniform', 'fast', 'slow', 'adaptive'])
+                       choices=['vanilla', 'uniform', 'fast', 'slow', 'adaptive', 'loss_aware'])
     parser.add_argument('--config', type=str, default='config.yaml')
+    parser.add_argument('--workers', type=str, default=None,
+                       help='客户端worker地址，如 127.0.0.1:6000,127.0.0.1:6001（见worker.py）')
     
     args = parser.parse_args()
     
     # 加载配置
-    with open(args.config, 'r') as f:
-        config = yaml.safe_load(f)
+    dataset_config = load_config(args.config, args.dataset)
     
     # 设置随机种子
-    set_seed(config['common']['seed'])
+    set_seed(dataset_config['seed'])
     
-    # 合并配置
-    dataset_config = {**config['common'], **config['datasets'][args.dataset]}
-    dataset_config['dataset'] = args.dataset  # 添加数据集名称
+    # 精度策略（需在创建模型之前设置）
+    set_dtype_policy(dataset_config['dtype'])
     
     # 创建客户端
     clients, test_data, model = setup_clients(
@@ -94,23 +137,33 @@ def main():
     print("Creating federated server...")
     server = FederatedServer(get_model(args.dataset), test_data)
     
+    # 远程客户端执行（可选）
+    executor = None
+    if args.workers:
+        print(f"Connecting to workers: {args.workers}")
+        executor = WorkerPool(parse_workers(args.workers))
+    
     # 分层和调度器（除vanilla外）
     tiers = None
     scheduler = None
+    evaluator = None
     
     if args.strategy != 'vanilla':
         print("Profiling clients and creating tiers...")
         tiering = TieringSystem(num_tiers=dataset_config['num_tiers'])
         global_weights = server.get_weights()
-        latencies = tiering.profile_clients(clients, global_weights, sync_rounds=3)
+        latencies = tiering.profile_clients(clients, global_weights, sync_rounds=3,
+                                            executor=executor)
         tiers = tiering.create_tiers(latencies)
         
         for tid, info in tiers.items():
             print(f"  Tier {tid}: {len(info['clients'])} clients, "
                   f"avg latency: {info['avg_latency']:.2f}s")
         
-        if args.strategy == 'adaptive':
+        if args.strategy in ['adaptive', 'loss_aware']:
             scheduler = AdaptiveScheduler(tiers, interval=50, initial_credits=10)
+            evaluator = TierEvaluator(server.global_model, clients, tiers,
+                                      samples_per_tier=dataset_config['tier_eval_samples'])
     
     # 训练
     trainer = FederatedTrainer(
@@ -119,10 +172,15 @@ def main():
         config=dataset_config,
         strategy_name=args.strategy,
         tiers=tiers,
-        scheduler=scheduler
+        scheduler=scheduler,
+        evaluator=evaluator,
+        executor=executor
     )
     
     metrics = trainer.train()
+    server.close()
+    if executor:
+        executor.close()
     
     # 保存结果
     save_dir = f"results/metrics/{args.dataset}_{args.strategy}"
@@ -134,6 +192,10 @@ def main():
     print(f"\nResults saved to {save_dir}/metrics.json")
     print(f"Final accuracy: {metrics['accuracy'][-1]:.4f}")
     print(f"Total time: {metrics['wall_clock_time'][-1]:.2f}s")
+    if metrics['time_to_target']:
+        tta = metrics['time_to_target']
+        print(f"Time to {tta['target']}: round {tta['round']+1}, "
+              f"simulated {tta['simulated_time']:.2f}s, wall {tta['wall_clock_time']:.2f}s")
 
 if __name__ == '__main__':
     main()
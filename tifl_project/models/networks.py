@@ -10,7 +10,7 @@ def create_mnist_model():
         tf.keras.layers.Flatten(),
         tf.keras.layers.Dense(128, activation='relu'),
         tf.keras.layers.Dropout(0.5),
-        tf.keras.layers.Dense(10, activation='softmax')
+        tf.keras.layers.Dense(10, activation='softmax', dtype='float32')
     ])
 
 def create_cifar_model():
@@ -27,7 +27,7 @@ def create_cifar_model():
         tf.keras.layers.Flatten(),
         tf.keras.layers.Dense(512, activation='relu'),
         tf.keras.layers.Dropout(0.5),
-        tf.keras.layers.Dense(10, activation='softmax')
+        tf.keras.layers.Dense(10, activation='softmax', dtype='float32')
     ])
 
 def get_model(dataset_name):
@@ -0,0 +1,27 @@
+import tensorflow as tf
+import numpy as np
+
+# 精度策略 -> 数据存储dtype；权重变量和聚合始终为float32
+DTYPE_POLICIES = {
+    'float32': np.float32,
+    'mixed_bfloat16': np.float32,
+    'mixed_float16': np.float16,
+}
+
+def set_dtype_policy(name='float32'):
+    """设置Keras全局精度策略，需在创建模型之前调用"""
+    if name not in DTYPE_POLICIES:
+        raise ValueError(f"Unknown dtype policy: {name}")
+    tf.keras.mixed_precision.set_global_policy(name)
+
+def data_dtype(name='float32'):
+    """数据集在内存中的存储dtype"""
+    if name not in DTYPE_POLICIES:
+        raise ValueError(f"Unknown dtype policy: {name}")
+    return DTYPE_POLICIES[name]
+
+def wrap_optimizer(optimizer):
+    """float16混合精度下使用动态损失缩放，防止梯度下溢"""
+    if tf.keras.mixed_precision.global_policy().name == 'mixed_float16':
+        return tf.keras.mixed_precision.LossScaleOptimizer(optimizer)
+    return optimizer
@@ -3,7 +3,7 @@
 # TiFL完整实验批量运行脚本
 
 DATASETS=("mnist" "fashion_mnist" "cifar10")
-STRATEGIES=("vanilla" "uniform" "fast" "slow" "adaptive")
+STRATEGIES=("vanilla" "uniform" "fast" "slow" "adaptive" "loss_aware")
 
 echo "=========================================="
 echo "TiFL Complete Reproduction"
@@ -34,3 +34,85 @@ class ClientSelector:
         tier_clients = tiers[tier_id]['clients']
         selected = np.random.choice(tier_clients, min(num_select, len(tier_clients)), replace=False).tolist()
         return selected, tier_id
+    
+    @staticmethod
+    def loss_aware(scheduler, tiers, clients, model, loss_cache, num_select, current_round,
+                   candidate_factor=1.5, executor=None):
+        """层级内Power-of-Choice：随机抽取候选客户端，选择全局模型损失最高的"""
+        tier_id = scheduler.select_tier(current_round)
+        tier_clients = tiers[tier_id]['clients']
+        num_candidates = min(len(tier_clients), int(np.ceil(candidate_factor * num_select)))
+        candidates = np.random.choice(tier_clients, num_candidates, replace=False).tolist()
+        
+        # 只对缓存过期的候选客户端做一次批量评估
+        loss_cache.refresh(model, clients, candidates, current_round, executor)
+        losses = loss_cache.get(candidates)
+        order = np.argsort(-losses, kind='stable')[:num_select]
+        return [candidates[i] for i in order], tier_id
+
+class LossCache:
+    """
+    客户端损失缓存
+    只存一种损失：某一轮全局模型在客户端本地数据（抽样）上的交叉熵，由refresh批量计算；
+    训练过程中的平均损失衡量的是本地模型，不写入缓存。超过max_age轮或被invalidate后视为过期
+    """
+    def __init__(self, max_age=10, samples_per_client=None, batch_size=1000):
+        self.max_age = max_age
+        self.samples_per_client = samples_per_client
+        self.batch_size = batch_size
+        self.losses = {}
+        self.rounds = {}
+    
+    def update(self, client_id, loss, current_round):
+        self.losses[client_id] = float(loss)
+        self.rounds[client_id] = current_round
+    
+    def invalidate(self, client_id):
+        """客户端参与训练后，其在新全局模型下的损失已改变"""
+        self.losses.pop(client_id, None)
+        self.rounds.pop(client_id, None)
+    
+    def stale(self, client_ids, current_round):
+        return [cid for cid in client_ids
+                if cid not in self.rounds or current_round - self.rounds[cid] > self.max_age]
+    
+    def get(self, client_ids):
+        return np.array([self.losses[cid] for cid in client_ids])
+    
+    def refresh(self, model, clients, client_ids, current_round, executor=None):
+        """
+        用当前全局模型对过期客户端做一次批量前向计算
+        executor给出时（core.rpc.WorkerPool）在托管这些客户端的worker上计算
+        """
+        stale_ids = self.stale(client_ids, current_round)
+        if not stale_ids:
+            return
+        
+        if executor is not None:
+            losses = executor.get_losses(stale_ids, model.get_weights(), self.samples_per_client)
+            for cid in stale_ids:
+                self.update(cid, losses[cid], current_round)
+            return
+        
+        x_parts, y_parts, owner = [], [], []
+        for pos, cid in enumerate(stale_ids):
+            client = clients[cid]
+            x, y = client.x_train, client.y_train
+            if self.samples_per_client and client.data_size > self.samples_per_client:
+                idx = np.random.choice(client.data_size, self.samples_per_client, replace=False)
+                x, y = x[idx], y[idx]
+            x_parts.append(x)
+            y_parts.append(y)
+            owner.append(np.full(len(y), pos))
+        
+        x_all = np.concatenate(x_parts)
+        y_all = np.concatenate(y_parts).astype(np.int64)
+        owner = np.concatenate(owner)
+        
+        probs = model.predict(x_all, batch_size=self.batch_size, verbose=0)
+        # 逐样本交叉熵，按客户端取平均
+        sample_loss = -np.log(np.clip(probs[np.arange(len(y_all)), y_all], 1e-7, 1.0))
+        totals = np.bincount(owner, weights=sample_loss, minlength=len(stale_ids))
+        counts = np.bincount(owner, minlength=len(stale_ids))
+        for pos, cid in enumerate(stale_ids):
+            self.update(cid, totals[pos] / counts[pos], current_round)
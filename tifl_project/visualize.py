@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 可视化实验结果
-使用方法: python visualize.py --dataset mnist
+使用方法: python visualize.py --dataset mnist [--target 0.9]
 """
 
 import argparse
@@ -70,13 +70,60 @@ def plot_comparison(dataset_name, strategies):
     print(f"Plot saved to {save_path}")
     plt.close()
 
+def time_to_accuracy(metrics, target):
+    """首次达到目标准确率的轮次、模拟时间和真实时间；未达到返回None"""
+    reached = np.flatnonzero(np.array(metrics['accuracy']) >= target)
+    if len(reached) == 0:
+        return None
+    idx = int(reached[0])
+    # 旧结果没有simulated_time，用每轮training_time累加
+    simulated = metrics.get('simulated_time') or np.cumsum(metrics['training_time']).tolist()
+    return {
+        'round': metrics['round'][idx],
+        'simulated_time': float(simulated[idx]),
+        'wall_clock_time': float(metrics['wall_clock_time'][idx])
+    }
+
+def time_to_accuracy_report(dataset_name, strategies, target):
+    """各策略达到目标准确率所需时间对比"""
+    report = {}
+    for strategy in strategies:
+        metrics_file = f"results/metrics/{dataset_name}_{strategy}/metrics.json"
+        if not os.path.exists(metrics_file):
+            print(f"Warning: {metrics_file} not found")
+            continue
+        with open(metrics_file, 'r') as f:
+            report[strategy] = time_to_accuracy(json.load(f), target)
+    
+    baseline = report.get('vanilla')
+    print(f"\n{dataset_name.upper()} - Time to accuracy {target}")
+    print(f"{'strategy':>12}{'round':>8}{'simulated(s)':>14}{'wall(s)':>10}{'speedup':>10}")
+    for strategy, tta in report.items():
+        if tta is None:
+            print(f"{strategy:>12}{'not reached':>42}")
+            continue
+        speedup = (f"{baseline['simulated_time'] / tta['simulated_time']:.2f}x"
+                   if baseline and tta['simulated_time'] > 0 else '-')
+        print(f"{strategy:>12}{tta['round']+1:>8}{tta['simulated_time']:>14.2f}"
+              f"{tta['wall_clock_time']:>10.2f}{speedup:>10}")
+    
+    save_path = f"results/metrics/{dataset_name}_time_to_accuracy.json"
+    os.makedirs('results/metrics', exist_ok=True)
+    with open(save_path, 'w') as f:
+        json.dump({'target': target, 'strategies': report}, f, indent=2)
+    print(f"Report saved to {save_path}")
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--dataset', type=str, required=True)
+    parser.add_argument('--target', type=float, default=None,
+                        help='目标准确率，给出时输出time-to-accuracy对比报告')
     args = parser.parse_args()
     
-    strategies = ['vanilla', 'uniform', 'fast', 'slow', 'adaptive']
+    strategies = ['vanilla', 'uniform', 'fast', 'slow', 'adaptive', 'loss_aware']
     plot_comparison(args.dataset, strategies)
+    if args.target is not None:
+        time_to_accuracy_report(args.dataset, strategies, args.target)
 
 if __name__ == '__main__':
     main()
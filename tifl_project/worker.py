@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+客户端Worker：托管 client_id % num_shards == shard 的客户端，供main.py --workers调用
+使用方法:
+    python worker.py --dataset mnist --shard 0 --num_shards 2 --port 6000
+    python worker.py --dataset mnist --shard 1 --num_shards 2 --port 6001
+    python main.py --dataset mnist --strategy adaptive --workers 127.0.0.1:6000,127.0.0.1:6001
+"""
+
+import argparse
+
+from main import load_config, set_seed, setup_clients
+from models.precision import set_dtype_policy
+from core.rpc import ClientWorker
+
+def main():
+    parser = argparse.ArgumentParser(description='TiFL Client Worker')
+    parser.add_argument('--dataset', type=str, required=True,
+                       choices=['mnist', 'fashion_mnist', 'cifar10'])
+    parser.add_argument('--shard', type=int, required=True)
+    parser.add_argument('--num_shards', type=int, required=True)
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--config', type=str, default='config.yaml')
+    args = parser.parse_args()
+    
+    # 与main.py使用相同的种子和配置，保证数据划分一致
+    dataset_config = load_config(args.config, args.dataset)
+    set_seed(dataset_config['seed'])
+    set_dtype_policy(dataset_config['dtype'])
+    
+    num_clients = dataset_config['num_clients']
+    client_ids = set(range(args.shard, num_clients, args.num_shards))
+    clients, _, _ = setup_clients(args.dataset, num_clients, dataset_config['cpu_alloc'],
+                                  dataset_config, client_ids=client_ids)
+    
+    worker = ClientWorker(clients, host=args.host, port=args.port)
+    print(f"Worker {args.shard}/{args.num_shards} serving {len(clients)} clients "
+          f"on {args.host}:{args.port}")
+    worker.serve_forever()
+
+if __name__ == '__main__':
+    main()